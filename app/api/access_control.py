@@ -1,4 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.repositories.access_control import AccessControlRepository
@@ -8,16 +11,33 @@ from app.core.dependencies import permission_checker, role_checker
 from app.models import access_control as ac_model
 from app.models.user import User
 from app.schemas import access_control as ac_schema
+from app.schemas.user import UserPage
 
 router = APIRouter()
 
 @router.post("/roles", response_model=ac_schema.Role, status_code=status.HTTP_201_CREATED)
 def create_role(role: ac_schema.RoleCreate, db: Session = Depends(get_db), admin_user: User = Depends(role_checker("admin"))):
     ac_repo = AccessControlRepository(db)
-    db_role = ac_repo.get_role_by_name(role.name)
-    if db_role:
+    try:
+        return ac_repo.create_role(role=role)
+    except IntegrityError:
         raise HTTPException(status_code=400, detail="Role already exists")
-    return ac_repo.create_role(role=role)
+
+@router.get("/users", response_model=UserPage)
+def list_users(
+    limit: int = Query(50, ge=1, le=200),
+    after_id: Optional[int] = Query(None, description="Курсор: id последнего пользователя предыдущей страницы"),
+    is_active: Optional[bool] = None,
+    role: Optional[str] = None,
+    search: Optional[str] = Query(None, min_length=1, description="Префикс email, имени или фамилии (без учёта регистра)"),
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(role_checker("admin")),
+):
+    user_repo = UserRepository(db)
+    users, next_cursor = user_repo.list_users(
+        limit=limit, after_id=after_id, is_active=is_active, role=role, search=search
+    )
+    return {"items": users, "next_cursor": next_cursor}
 
 @router.post("/users/{user_id}/roles/{role_name}")
 def assign_role_to_user(user_id: int, role_name: str, db: Session = Depends(get_db), admin_user: User = Depends(role_checker("admin"))):
@@ -36,13 +56,19 @@ def assign_role_to_user(user_id: int, role_name: str, db: Session = Depends(get_
 @router.post("/permissions", response_model=ac_schema.Permission, status_code=status.HTTP_201_CREATED)
 def create_permission(permission: ac_schema.PermissionCreate, db: Session = Depends(get_db), admin_user: User = Depends(role_checker("admin"))):
     ac_repo = AccessControlRepository(db)
-    return ac_repo.create_permission(permission=permission)
+    try:
+        return ac_repo.create_permission(permission=permission)
+    except IntegrityError:
+        raise HTTPException(status_code=400, detail="Permission already exists")
 
 
 @router.post("/elements", response_model=ac_schema.BusinessElement, status_code=status.HTTP_201_CREATED)
 def create_business_element(element: ac_schema.BusinessElementCreate, db: Session = Depends(get_db), admin_user: User = Depends(role_checker("admin"))):
     ac_repo = AccessControlRepository(db)
-    return ac_repo.create_business_element(element=element)
+    try:
+        return ac_repo.create_business_element(element=element)
+    except IntegrityError:
+        raise HTTPException(status_code=400, detail="Business element already exists")
 
 
 @router.post("/roles/{role_name}/permissions")
@@ -3,13 +3,16 @@ from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
 from app.schemas.user import TokenData
 from datetime import timedelta
-from app.schemas.user import Token
+from app.schemas.user import Token, RefreshTokenRequest
 from app.core.security import verify_password, create_access_token
+from app.core.responses import fast_json_response, user_response
 from app.models.user import User as UserModel
 from app.config.settings import get_settings
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.schemas.user import UserCreate, User, UserUpdate
+from app.repositories.refresh_token import RefreshTokenRepository
 from app.repositories.user import UserRepository
 
 router = APIRouter()
@@ -40,13 +43,13 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
 @router.post("/register", response_model=User, status_code=status.HTTP_201_CREATED)
 def register_user(user: UserCreate, db: Session = Depends(get_db)):
     user_repo = UserRepository(db)
-    db_user = user_repo.get_user_by_email(email=user.email)
-    if db_user:
+    try:
+        return user_repo.create_user(user=user)
+    except IntegrityError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered",
         )
-    return user_repo.create_user(user=user)
 
 
 @router.post("/login", response_model=Token)
@@ -59,23 +62,61 @@ def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db:
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    refresh_token = RefreshTokenRepository(db).create(
+        user_id=user.id, expires_delta=timedelta(days=get_settings().REFRESH_TOKEN_EXPIRE_DAYS)
+    )
+    return _token_response(user, refresh_token)
+
+
+@router.post("/refresh", response_model=Token)
+def refresh_access_token(request: RefreshTokenRequest, db: Session = Depends(get_db)):
+    # Пароль не проверяется: refresh-токен ищется по SHA-256 и сразу ротируется
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    settings = get_settings()
+    rotated = RefreshTokenRepository(db).rotate(
+        request.refresh_token,
+        expires_delta=timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+        reuse_grace=timedelta(seconds=settings.REFRESH_TOKEN_REUSE_GRACE_SECONDS),
+    )
+    if rotated is None:
+        raise credentials_exception
+    user, refresh_token = rotated
+    return _token_response(user, refresh_token)
+
+
+def _token_response(user: UserModel, refresh_token: str):
     settings = get_settings()
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": user.email}, expires_delta=access_token_expires
     )
-    return {"access_token": access_token, "token_type": "bearer"}
+    token = {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+    if settings.FAST_RESPONSES:
+        return fast_json_response(token)
+    return token
 
 
 @router.get("/users/me", response_model=User)
 def read_users_me(current_user: UserModel = Depends(get_current_user)):
+    if get_settings().FAST_RESPONSES:
+        return user_response(current_user)
     return current_user
 
 
 @router.put("/users/me", response_model=User)
 def update_user_me(user_update: UserUpdate, current_user: UserModel = Depends(get_current_user), db: Session = Depends(get_db)):
     user_repo = UserRepository(db)
-    return user_repo.update_user(user=current_user, user_update=user_update)
+    try:
+        return user_repo.update_user(user=current_user, user_update=user_update)
+    except IntegrityError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered",
+        )
 
 
 @router.delete("/users/me", response_model=User)
@@ -85,7 +126,10 @@ def delete_user_me(current_user: UserModel = Depends(get_current_user), db: Sess
 
 
 @router.post("/logout")
-def logout(current_user: UserModel = Depends(get_current_user)):
-    # В stateless JWT-архитектуре logout обрабатывается на клиенте удалением токена.
-    # Этот эндпоинт здесь для полноты API.
+def logout(request: RefreshTokenRequest | None = None, current_user: UserModel = Depends(get_current_user), db: Session = Depends(get_db)):
+    # Если передан refresh-токен, отзывается вся цепочка этого входа; access-токен
+    # остаётся действительным до истечения своего короткого срока.
+    # Без тела запроса logout, как и раньше, выполняется на клиенте.
+    if request is not None:
+        RefreshTokenRepository(db).revoke(request.refresh_token, user_id=current_user.id)
     return {"message": "Successfully logged out"}
@@ -3,7 +3,9 @@ from typing import List
 from pydantic import BaseModel
 
 from app.api.auth import get_current_user
+from app.config.settings import get_settings
 from app.core.dependencies import permission_checker
+from app.core.responses import fast_json_response
 from app.core.database import SessionLocal
 from app.models.user import User
 
@@ -27,6 +29,8 @@ class Article(BaseModel):
 def get_articles_list(current_user: User = Depends(permission_checker("read", "articles"))):
     # This endpoint is simplified. A real implementation would check for 'read_own' 
     # and filter the list, or allow full access for 'read_all'.
+    if get_settings().FAST_RESPONSES:
+        return fast_json_response(mock_articles)
     return mock_articles
 
 @router.post("/articles", response_model=Article, status_code=status.HTTP_201_CREATED)
@@ -1,13 +1,34 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Literal
 
 class Settings(BaseSettings):
     PROJECT_NAME: str
     API_V1_STR: str
     SECRET_KEY: str
     ALGORITHM: str
-    ACCESS_TOKEN_EXPIRE_MINUTES: int
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    REFRESH_TOKEN_REUSE_GRACE_SECONDS: int = 10
     DATABASE_URL: str
+
+    # Аудит решений авторизации
+    AUDIT_ENABLED: bool = False
+    AUDIT_SINK: Literal["db", "file"] = "db"
+    AUDIT_SAMPLE_RATE: float = 1.0
+    AUDIT_QUEUE_SIZE: int = 10000
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0
+    AUDIT_FILE_PATH: str = "authorization_audit.log"
+    AUDIT_FILE_MAX_BYTES: int = 10 * 1024 * 1024
+    AUDIT_FILE_BACKUP_COUNT: int = 5
+
+    # Быстрая сериализация ответов горячих эндпоинтов (orjson, без повторной валидации)
+    FAST_RESPONSES: bool = False
+
+    # Скомпилированный снимок правил доступа (см. compile_policy.py)
+    POLICY_SNAPSHOT_PATH: str = "policy.snapshot"
+    POLICY_VERSION_TTL_SECONDS: float = 5.0
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,236 @@
+"""
+Асинхронный аудит решений авторизации.
+
+Решения кладутся в ограниченную in-process очередь и никогда не блокируют
+обработку запроса: при переполнении событие отбрасывается и учитывается в
+счётчике. Фоновый поток выгружает события пачками — многострочным INSERT
+в таблицу authorization_audit либо в ротируемый локальный файл.
+"""
+import json
+import logging
+import queue
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from typing import Optional
+
+from sqlalchemy import insert
+
+from app.config.settings import get_settings
+from app.core.database import SessionLocal
+from app.models.audit import AuthorizationAudit
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AuditEvent:
+    user_id: Optional[int]
+    permission: str
+    element: Optional[str]
+    owner_id: Optional[int]
+    allowed: bool
+    latency_ms: float
+    timestamp: float = field(default_factory=time.time)
+
+
+class DatabaseSink:
+    def write(self, events: list[AuditEvent]) -> None:
+        rows = [
+            {
+                "user_id": e.user_id,
+                "permission": e.permission,
+                "element": e.element,
+                "owner_id": e.owner_id,
+                "allowed": e.allowed,
+                "latency_ms": e.latency_ms,
+                "decided_at": datetime.utcfromtimestamp(e.timestamp),
+            }
+            for e in events
+        ]
+        db = SessionLocal()
+        try:
+            db.execute(insert(AuthorizationAudit), rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def close(self) -> None:
+        pass
+
+
+class FileSink:
+    def __init__(self, path: str, max_bytes: int, backup_count: int):
+        self._file_logger = logging.getLogger(f"{__name__}.file")
+        self._file_logger.propagate = False
+        self._file_logger.setLevel(logging.INFO)
+        self._handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count)
+        self._file_logger.addHandler(self._handler)
+
+    def write(self, events: list[AuditEvent]) -> None:
+        # Один вызов на пачку: строки JSON Lines, разделённые переводом строки
+        self._file_logger.info("\n".join(json.dumps(asdict(e)) for e in events))
+
+    def close(self) -> None:
+        self._file_logger.removeHandler(self._handler)
+        self._handler.close()
+
+
+class AuditLogger:
+    def __init__(
+        self,
+        sink,
+        queue_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        sample_rate: float = 1.0,
+    ):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.sample_rate = sample_rate
+        self._queue: queue.Queue[AuditEvent] = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.counters = {"enqueued": 0, "sampled_out": 0, "dropped": 0, "written": 0, "failed": 0}
+
+    def _incr(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += value
+
+    def record(
+        self,
+        user_id: Optional[int],
+        permission: str,
+        element: Optional[str],
+        owner_id: Optional[int],
+        allowed: bool,
+        latency_ms: float,
+    ) -> None:
+        # Отказы пишутся всегда, разрешения — с заданной вероятностью
+        if allowed and self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            self._incr("sampled_out")
+            return
+        event = AuditEvent(user_id, permission, element, owner_id, allowed, latency_ms)
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self._incr("dropped")
+            return
+        self._incr("enqueued")
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="authorization-audit", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.sink.close()
+
+    def _drain(self) -> list[AuditEvent]:
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _collect(self, first: AuditEvent) -> list[AuditEvent]:
+        # Пачка закрывается по размеру batch_size или через flush_interval
+        # после первого события в ней
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size and not self._stop.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _flush(self, batch: list[AuditEvent]) -> None:
+        if not batch:
+            return
+        try:
+            self.sink.write(batch)
+        except Exception:
+            logger.exception("Failed to write %d audit events", len(batch))
+            self._incr("failed", len(batch))
+            return
+        self._incr("written", len(batch))
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            self._flush(self._collect(first))
+        # Дописываем то, что осталось в очереди на момент остановки
+        while not self._queue.empty():
+            self._flush(self._drain())
+
+
+_audit_logger: Optional[AuditLogger] = None
+
+
+def get_audit_logger() -> Optional[AuditLogger]:
+    return _audit_logger
+
+
+def start_audit_logger() -> None:
+    global _audit_logger
+    settings = get_settings()
+    if not settings.AUDIT_ENABLED or _audit_logger is not None:
+        return
+    if settings.AUDIT_SINK == "file":
+        sink = FileSink(settings.AUDIT_FILE_PATH, settings.AUDIT_FILE_MAX_BYTES, settings.AUDIT_FILE_BACKUP_COUNT)
+    else:
+        sink = DatabaseSink()
+    _audit_logger = AuditLogger(
+        sink,
+        queue_size=settings.AUDIT_QUEUE_SIZE,
+        batch_size=settings.AUDIT_BATCH_SIZE,
+        flush_interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+        sample_rate=settings.AUDIT_SAMPLE_RATE,
+    )
+    _audit_logger.start()
+
+
+def stop_audit_logger() -> None:
+    global _audit_logger
+    if _audit_logger is not None:
+        _audit_logger.stop()
+        _audit_logger = None
+
+
+def audit_decision(
+    user_id: Optional[int],
+    permission: str,
+    element: Optional[str],
+    owner_id: Optional[int],
+    allowed: bool,
+    started_at: float,
+) -> None:
+    audit_logger = _audit_logger
+    if audit_logger is None:
+        return
+    latency_ms = (time.perf_counter() - started_at) * 1000
+    audit_logger.record(user_id, permission, element, owner_id, allowed, latency_ms)
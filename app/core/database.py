@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config.settings import get_settings
@@ -8,7 +8,23 @@ settings = get_settings()
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
 engine = create_engine(SQLALCHEMY_DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def _unicode_lower(value):
+    return value.lower() if isinstance(value, str) else value
+
+
+if engine.dialect.name == "sqlite":
+    # Встроенный lower() в SQLite приводит к нижнему регистру только ASCII.
+    # Подменяем его на str.lower, чтобы поиск по префиксу (и индексы по
+    # lower(...)) совпадал с приведением строки поиска в Python.
+    @event.listens_for(engine, "connect")
+    def _register_sqlite_functions(dbapi_connection, connection_record):
+        dbapi_connection.create_function("lower", 1, _unicode_lower, deterministic=True)
+
+# expire_on_commit=False: объекты, полученные через RETURNING, остаются
+# заполненными после commit и не перечитываются отдельным SELECT
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 Base = declarative_base()
 
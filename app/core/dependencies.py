@@ -1,15 +1,22 @@
+import time
+
 from fastapi import Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.api.auth import get_current_user
+from app.core.audit import audit_decision
 from app.core.database import get_db
+from app.core.policy_snapshot import get_current_snapshot
 from app.models import access_control as ac_model
 from app.models.user import User
 
 
 def role_checker(required_role: str):
     def checker(current_user: User = Depends(get_current_user)):
-        if required_role not in [role.name for role in current_user.roles]:
+        started_at = time.perf_counter()
+        allowed = required_role in [role.name for role in current_user.roles]
+        audit_decision(current_user.id, f"role:{required_role}", None, None, allowed, started_at)
+        if not allowed:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Operation not permitted",
@@ -19,44 +26,60 @@ def role_checker(required_role: str):
     return checker
 
 
+def _find_permission_in_db(db: Session, current_user: User, required_permissions: list[str], element_name: str):
+    for role in current_user.roles:
+        for perm_name in required_permissions:
+            permission = (
+                db.query(ac_model.Permission)
+                .filter(ac_model.Permission.name == perm_name)
+                .first()
+            )
+            element = (
+                db.query(ac_model.BusinessElement)
+                .filter(ac_model.BusinessElement.name == element_name)
+                .first()
+            )
+            if not permission or not element:
+                continue
+
+            has_perm = (
+                db.query(ac_model.role_permission_association)
+                .filter(
+                    ac_model.role_permission_association.c.role_id == role.id,
+                    ac_model.role_permission_association.c.permission_id
+                    == permission.id,
+                    ac_model.role_permission_association.c.element_id == element.id,
+                )
+                .first()
+            )
+            if has_perm:
+                return perm_name
+    return None
+
+
 def permission_checker(permission_base_name: str, element_name: str):
     def checker(
         current_user: User = Depends(get_current_user),
         db: Session = Depends(get_db),
         owner_id: int = None,
     ):
+        started_at = time.perf_counter()
         required_permissions = [f"{permission_base_name}_all"]
         if owner_id and owner_id == current_user.id:
             required_permissions.append(f"{permission_base_name}_own")
 
-        for role in current_user.roles:
-            for perm_name in required_permissions:
-                permission = (
-                    db.query(ac_model.Permission)
-                    .filter(ac_model.Permission.name == perm_name)
-                    .first()
-                )
-                element = (
-                    db.query(ac_model.BusinessElement)
-                    .filter(ac_model.BusinessElement.name == element_name)
-                    .first()
-                )
-                if not permission or not element:
-                    continue
+        # Снимок правил используется, пока версия в БД не новее его версии
+        snapshot = get_current_snapshot(db)
+        if snapshot is not None:
+            granted = snapshot.find_permission(current_user.id, required_permissions, element_name)
+        else:
+            granted = _find_permission_in_db(db, current_user, required_permissions, element_name)
 
-                has_perm = (
-                    db.query(ac_model.role_permission_association)
-                    .filter(
-                        ac_model.role_permission_association.c.role_id == role.id,
-                        ac_model.role_permission_association.c.permission_id
-                        == permission.id,
-                        ac_model.role_permission_association.c.element_id == element.id,
-                    )
-                    .first()
-                )
-                if has_perm:
-                    return current_user
+        if granted:
+            audit_decision(current_user.id, permission_base_name, element_name, owner_id, True, started_at)
+            return current_user
 
+        audit_decision(current_user.id, permission_base_name, element_name, owner_id, False, started_at)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Operation not permitted for this business element",
@@ -0,0 +1,356 @@
+"""
+Скомпилированный снимок правил доступа.
+
+Содержимое таблиц roles, permissions, business_elements, role_permission и
+user_role упаковывается в компактный бинарный файл. Воркеры отображают его в
+память (mmap, только чтение), поэтому страницы файла разделяются между
+процессами, а permission_checker принимает решения без запросов к БД, пока
+версия правил в БД не станет новее версии снимка.
+
+Формат (little-endian):
+    заголовок        HEADER
+    rules            n_rules * u64, отсортированы:
+                     (role_id << 32) | (permission_idx << 16) | element_idx
+    user_roles       n_user_roles * u64, отсортированы: (user_id << 32) | role_id
+    roles            n_roles * (u32 id, u16 len, utf-8 name)
+    permissions      n_permissions * (u32 id, u16 len, utf-8 name)
+    elements         n_elements * (u32 id, u16 len, utf-8 name)
+
+permission_idx и element_idx — позиции в соответствующих секциях (по id).
+"""
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from typing import Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.models import access_control as ac_model
+
+MAGIC = b"ACLSNAP\0"
+FORMAT_VERSION = 1
+# magic, format_version, policy_version, n_roles, n_permissions, n_elements, n_rules, n_user_roles
+HEADER = struct.Struct("<8sIQIIIII")
+NAME_ENTRY = struct.Struct("<IH")
+MAX_INDEX = 0xFFFF
+
+
+class PolicySnapshotError(Exception):
+    pass
+
+
+def _pack_names(rows: Iterable[tuple[int, str]]) -> bytes:
+    chunks = []
+    for id_, name in rows:
+        encoded = name.encode("utf-8")
+        chunks.append(NAME_ENTRY.pack(id_, len(encoded)))
+        chunks.append(encoded)
+    return b"".join(chunks)
+
+
+def compile_snapshot(db: Session, path: str) -> int:
+    """Компилирует правила из БД в файл снимка и возвращает версию правил."""
+    # Версия и таблицы читаются в одной транзакции
+    # Без строки версии снимок получает версию 0; воркеры при этом всё равно
+    # проверяют права по БД, пока версия неизвестна
+    policy_version = db.execute(
+        select(ac_model.PolicyState.version).where(ac_model.PolicyState.id == 1)
+    ).scalar_one_or_none() or 0
+    roles = db.execute(select(ac_model.Role.id, ac_model.Role.name).order_by(ac_model.Role.id)).all()
+    permissions = db.execute(
+        select(ac_model.Permission.id, ac_model.Permission.name).order_by(ac_model.Permission.id)
+    ).all()
+    elements = db.execute(
+        select(ac_model.BusinessElement.id, ac_model.BusinessElement.name).order_by(ac_model.BusinessElement.id)
+    ).all()
+    if len(permissions) > MAX_INDEX or len(elements) > MAX_INDEX:
+        raise PolicySnapshotError("Too many permissions or business elements for the snapshot format")
+
+    permission_idx = {id_: idx for idx, (id_, _) in enumerate(permissions)}
+    element_idx = {id_: idx for idx, (id_, _) in enumerate(elements)}
+    rp = ac_model.role_permission_association.c
+    rules = sorted(
+        {
+            (role_id << 32) | (permission_idx[permission_id] << 16) | element_idx[element_id]
+            for role_id, permission_id, element_id in db.execute(select(rp.role_id, rp.permission_id, rp.element_id))
+            if role_id is not None and permission_id in permission_idx and element_id in element_idx
+        }
+    )
+    ur = ac_model.user_role_association.c
+    user_roles = sorted(
+        {
+            (user_id << 32) | role_id
+            for user_id, role_id in db.execute(select(ur.user_id, ur.role_id))
+            if user_id is not None and role_id is not None
+        }
+    )
+
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, policy_version,
+        len(roles), len(permissions), len(elements), len(rules), len(user_roles),
+    )
+    payload = b"".join([
+        header,
+        struct.pack(f"<{len(rules)}Q", *rules),
+        struct.pack(f"<{len(user_roles)}Q", *user_roles),
+        _pack_names(roles),
+        _pack_names(permissions),
+        _pack_names(elements),
+    ])
+
+    # Атомарная замена: воркеры со старым mmap продолжают читать прежний файл
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".policy-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        _verify_snapshot(tmp_path, policy_version, roles, permissions, elements, rules, user_roles)
+        # mkstemp создаёт файл с правами 0600; воркеры могут работать
+        # под другим пользователем
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return policy_version
+
+
+def _verify_snapshot(path, policy_version, roles, permissions, elements, rules, user_roles) -> None:
+    """Проверяет, что записанный файл читается обратно в исходные правила."""
+    snapshot = PolicySnapshot.load(path)
+    try:
+        permission_names = [name for _, name in permissions]
+        element_names = [name for _, name in elements]
+        if (
+            snapshot.version != policy_version
+            or snapshot.role_names != {id_: name for id_, name in roles}
+            or snapshot.rule_count != len(rules)
+        ):
+            raise PolicySnapshotError("Snapshot header or name tables do not match the database")
+        for key in rules:
+            role_id = key >> 32
+            permission_name = permission_names[(key >> 16) & MAX_INDEX]
+            element_name = element_names[key & MAX_INDEX]
+            if not snapshot.has_rule(role_id, permission_name, element_name):
+                raise PolicySnapshotError("Snapshot rules do not match the database")
+        expected_roles: dict[int, list[int]] = {}
+        for key in user_roles:
+            expected_roles.setdefault(key >> 32, []).append(key & 0xFFFFFFFF)
+        if snapshot.user_role_count != len(user_roles) or any(
+            snapshot.role_ids_for_user(user_id) != role_ids for user_id, role_ids in expected_roles.items()
+        ):
+            raise PolicySnapshotError("Snapshot user roles do not match the database")
+    finally:
+        snapshot.close()
+
+
+class PolicySnapshot:
+    def __init__(self, buffer):
+        self._buffer = buffer
+        view = memoryview(buffer)
+        if len(view) < HEADER.size:
+            raise PolicySnapshotError("Snapshot file is truncated")
+        magic, format_version, policy_version, n_roles, n_permissions, n_elements, n_rules, n_user_roles = (
+            HEADER.unpack_from(view)
+        )
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            raise PolicySnapshotError("Unsupported snapshot format")
+        if sys.byteorder != "little":
+            # Массивы u64 читаются через memoryview.cast в порядке байт хоста
+            raise PolicySnapshotError("Snapshot format requires a little-endian host")
+        self.version = policy_version
+
+        offset = HEADER.size
+        # Массивы u64 читаются прямо из отображённой памяти без копирования
+        self._rules = view[offset:offset + n_rules * 8].cast("Q")
+        offset += n_rules * 8
+        self._user_roles = view[offset:offset + n_user_roles * 8].cast("Q")
+        offset += n_user_roles * 8
+
+        # Справочники имён небольшие, их удобнее держать словарями
+        self.role_names: dict[int, str] = {}
+        self._permission_idx: dict[str, int] = {}
+        self._element_idx: dict[str, int] = {}
+        for count, target, by_position in (
+            (n_roles, self.role_names, False),
+            (n_permissions, self._permission_idx, True),
+            (n_elements, self._element_idx, True),
+        ):
+            for position in range(count):
+                id_, length = NAME_ENTRY.unpack_from(view, offset)
+                offset += NAME_ENTRY.size
+                name = bytes(view[offset:offset + length]).decode("utf-8")
+                offset += length
+                if by_position:
+                    target[name] = position
+                else:
+                    target[id_] = name
+
+    @classmethod
+    def load(cls, path: str) -> "PolicySnapshot":
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer)
+
+    def close(self) -> None:
+        self._rules.release()
+        self._user_roles.release()
+        self._buffer.close()
+
+    @property
+    def rule_count(self) -> int:
+        return len(self._rules)
+
+    @property
+    def user_role_count(self) -> int:
+        return len(self._user_roles)
+
+    @staticmethod
+    def _contains(array, key: int) -> bool:
+        i = bisect_left(array, key)
+        return i < len(array) and array[i] == key
+
+    def role_ids_for_user(self, user_id: int) -> list[int]:
+        start = user_id << 32
+        i = bisect_left(self._user_roles, start)
+        role_ids = []
+        while i < len(self._user_roles) and self._user_roles[i] >> 32 == user_id:
+            role_ids.append(self._user_roles[i] & 0xFFFFFFFF)
+            i += 1
+        return role_ids
+
+    def find_permission(self, user_id: int, permission_names: list[str], element_name: str) -> Optional[str]:
+        """Возвращает первое из разрешений, выданное ролям пользователя на элемент."""
+        element_idx = self._element_idx.get(element_name)
+        if element_idx is None:
+            return None
+        role_ids = self.role_ids_for_user(user_id)
+        for role_id in role_ids:
+            for perm_name in permission_names:
+                permission_idx = self._permission_idx.get(perm_name)
+                if permission_idx is None:
+                    continue
+                if self._contains(self._rules, (role_id << 32) | (permission_idx << 16) | element_idx):
+                    return perm_name
+        return None
+
+    def has_rule(self, role_id: int, permission_name: str, element_name: str) -> bool:
+        permission_idx = self._permission_idx.get(permission_name)
+        element_idx = self._element_idx.get(element_name)
+        if permission_idx is None or element_idx is None:
+            return False
+        return self._contains(self._rules, (role_id << 32) | (permission_idx << 16) | element_idx)
+
+
+class PolicyVersionTracker:
+    """Кэширует версию правил из БД, чтобы не запрашивать её на каждый запрос.
+
+    None означает, что версия неизвестна (в policy_state нет строки): тогда
+    снимку доверять нельзя и права проверяются по БД.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._version: Optional[int] = None
+        self._checked_at: Optional[float] = None
+
+    def expire(self) -> None:
+        self._checked_at = None
+
+    def current_version(self, db: Session, fallback: int) -> Optional[int]:
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.ttl:
+            return self._version
+        try:
+            version = db.execute(
+                select(ac_model.PolicyState.version).where(ac_model.PolicyState.id == 1)
+            ).scalar_one_or_none()
+        except SQLAlchemyError:
+            # БД недоступна: продолжаем работать по последней известной версии
+            # и повторяем запрос не раньше, чем через ttl
+            db.rollback()
+            if self._checked_at is None and self._version is None:
+                self._version = fallback
+            self._checked_at = now
+            return self._version
+        self._version = version
+        self._checked_at = now
+        return version
+
+
+_snapshot: Optional[PolicySnapshot] = None
+_snapshot_path: Optional[str] = None
+_snapshot_stat: Optional[tuple[int, int, int]] = None
+_tracker: Optional[PolicyVersionTracker] = None
+_reload_lock = threading.Lock()
+
+
+def _file_stat(path: str) -> Optional[tuple[int, int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+def load_policy_snapshot(path: str, version_ttl: float) -> Optional[PolicySnapshot]:
+    global _snapshot, _snapshot_path, _snapshot_stat, _tracker
+    _snapshot_path = path
+    _tracker = PolicyVersionTracker(version_ttl)
+    stat = _file_stat(path)
+    if stat is None:
+        return None
+    _snapshot = PolicySnapshot.load(path)
+    _snapshot_stat = stat
+    return _snapshot
+
+
+def _reload_snapshot(min_version: int) -> Optional[PolicySnapshot]:
+    """Перечитывает файл снимка, если он был заменён более новым."""
+    global _snapshot, _snapshot_stat
+    with _reload_lock:
+        stat = _file_stat(_snapshot_path)
+        if stat is not None and stat != _snapshot_stat:
+            try:
+                candidate = PolicySnapshot.load(_snapshot_path)
+            except (OSError, ValueError, PolicySnapshotError):
+                candidate = None
+            if candidate is not None and (_snapshot is None or candidate.version > _snapshot.version):
+                # Старое отображение не закрываем: его могут читать другие потоки
+                _snapshot = candidate
+            _snapshot_stat = stat
+        snapshot = _snapshot
+    if snapshot is not None and snapshot.version >= min_version:
+        return snapshot
+    return None
+
+
+def get_current_snapshot(db: Session) -> Optional[PolicySnapshot]:
+    """Возвращает снимок, если версия правил в БД не новее его версии."""
+    snapshot, tracker = _snapshot, _tracker
+    if tracker is None:
+        return None
+    fallback = snapshot.version if snapshot is not None else 0
+    db_version = tracker.current_version(db, fallback=fallback)
+    if db_version is None:
+        return None
+    if snapshot is not None and db_version <= snapshot.version:
+        return snapshot
+    # Снимок устарел или отсутствует: возможно, его уже перекомпилировали
+    return _reload_snapshot(db_version)
+
+
+def expire_policy_version() -> None:
+    """Сбрасывает кэш версии после изменения правил в этом процессе."""
+    tracker = _tracker
+    if tracker is not None:
+        tracker.expire()
@@ -0,0 +1,33 @@
+"""
+Быстрый путь сериализации ответов для горячих эндпоинтов.
+
+Включается настройкой FAST_RESPONSES. Эндпоинт возвращает готовый Response,
+поэтому FastAPI пропускает валидацию через response_model и jsonable_encoder:
+данные уже доверенные (ORM-объект или внутренние словари), а orjson кодирует
+их заметно быстрее стандартного json.
+"""
+from typing import Any
+
+import orjson
+from fastapi.responses import Response
+
+from app.models.user import User
+from app.schemas.user import User as UserSchema
+
+# Поля ответа /users/me берутся из схемы, чтобы не расходиться с response_model
+USER_FIELDS = tuple(UserSchema.model_fields)
+
+
+class ORJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+
+def fast_json_response(content: Any, status_code: int = 200) -> Response:
+    return ORJSONResponse(content=content, status_code=status_code)
+
+
+def user_response(user: User) -> Response:
+    return fast_json_response({name: getattr(user, name) for name in USER_FIELDS})
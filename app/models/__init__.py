@@ -1 +1,3 @@
 from .user import User
+from .audit import AuthorizationAudit
+from .refresh_token import RefreshToken
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Table
+from sqlalchemy import DDL, Column, Integer, String, ForeignKey, Index, Table, event
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -8,6 +8,8 @@ user_role_association = Table(
     Base.metadata,
     Column("user_id", Integer, ForeignKey("users.id"), comment="Внешний ключ на таблицу пользователей"),
     Column("role_id", Integer, ForeignKey("roles.id"), comment="Внешний ключ на таблицу ролей"),
+    # Фильтр списка пользователей по роли
+    Index("ix_user_role_role_id_user_id", "role_id", "user_id"),
     comment="Ассоциативная таблица для связи пользователей и ролей",
 )
 
@@ -44,3 +46,15 @@ class BusinessElement(Base):
     __tablename__ = "business_elements"
     id = Column(Integer, primary_key=True, index=True, comment="Уникальный идентификатор бизнес-элемента")
     name = Column(String, unique=True, index=True, nullable=False, comment="Название бизнес-элемента")
+
+class PolicyState(Base):
+    __tablename__ = "policy_state"
+    id = Column(Integer, primary_key=True, comment="Единственная строка с id = 1")
+    version = Column(Integer, nullable=False, default=0, comment="Версия правил доступа, растёт при каждом изменении")
+
+# Строка с версией создаётся вместе с таблицей
+event.listen(
+    PolicyState.__table__,
+    "after_create",
+    DDL("INSERT INTO policy_state (id, version) VALUES (1, 0)"),
+)
@@ -0,0 +1,14 @@
+from sqlalchemy import Boolean, Column, DateTime, Float, Integer, String, func
+from app.core.database import Base
+
+class AuthorizationAudit(Base):
+    __tablename__ = "authorization_audit"
+    id = Column(Integer, primary_key=True, comment="Уникальный идентификатор записи")
+    user_id = Column(Integer, index=True, comment="Пользователь, для которого принималось решение")
+    permission = Column(String, nullable=False, comment="Запрошенное действие (read, update, ...) или role:<имя> для проверки роли")
+    element = Column(String, nullable=True, comment="Бизнес-элемент")
+    owner_id = Column(Integer, nullable=True, comment="Владелец объекта, если передан")
+    allowed = Column(Boolean, nullable=False, comment="Результат проверки")
+    latency_ms = Column(Float, nullable=False, comment="Время принятия решения, мс")
+    decided_at = Column(DateTime, nullable=False, index=True, comment="Время принятия решения (UTC)")
+    created_at = Column(DateTime, server_default=func.now(), comment="Время записи в БД")
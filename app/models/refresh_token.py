@@ -0,0 +1,12 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, func
+from app.core.database import Base
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+    id = Column(Integer, primary_key=True, comment="Уникальный идентификатор refresh-токена")
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True, comment="Владелец токена")
+    token_hash = Column(String(64), unique=True, index=True, nullable=False, comment="SHA-256 от токена (hex)")
+    family_id = Column(String(32), nullable=False, index=True, comment="Цепочка ротаций, начатая одним входом")
+    expires_at = Column(DateTime, nullable=False, comment="Время истечения токена")
+    revoked_at = Column(DateTime, nullable=True, comment="Время отзыва (использования) токена")
+    created_at = Column(DateTime, server_default=func.now(), comment="Время создания записи")
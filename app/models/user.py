@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, func
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index, func
 from sqlalchemy.orm import relationship
 from .access_control import user_role_association
 from app.core.database import Base
@@ -18,3 +18,26 @@ class User(Base):
     roles = relationship(
         "Role", secondary=user_role_association, back_populates="users"
     )
+
+    __table_args__ = (
+        # Keyset-пагинация по id с фильтром по is_active
+        Index("ix_users_is_active_id", "is_active", "id"),
+        # Функциональные индексы для регистронезависимого поиска по префиксу.
+        # На Postgres text_pattern_ops позволяет использовать индекс для LIKE 'prefix%'
+        # при любой локали; SQLite использует обычный индекс по выражению.
+        Index(
+            "ix_users_email_lower",
+            func.lower(email).label("email_lower"),
+            postgresql_ops={"email_lower": "text_pattern_ops"},
+        ),
+        Index(
+            "ix_users_first_name_lower",
+            func.lower(first_name).label("first_name_lower"),
+            postgresql_ops={"first_name_lower": "text_pattern_ops"},
+        ),
+        Index(
+            "ix_users_last_name_lower",
+            func.lower(last_name).label("last_name_lower"),
+            postgresql_ops={"last_name_lower": "text_pattern_ops"},
+        ),
+    )
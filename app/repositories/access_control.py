@@ -1,6 +1,8 @@
+from sqlalchemy import insert, select, update
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
+from app.core.policy_snapshot import expire_policy_version
 from app.models import access_control as ac_model
 from app.models import user as user_model
 from app.schemas import access_control as ac_schema
@@ -9,13 +11,32 @@ class AccessControlRepository:
     def __init__(self, db: Session):
         self.db = db
 
+    def _bump_policy_version(self):
+        # Выполняется в той же транзакции, что и изменение правил. Строку
+        # создаёт DDL-хук таблицы; если таблица создана иначе (миграцией,
+        # из дампа схемы), строка добавляется здесь
+        result = self.db.execute(
+            update(ac_model.PolicyState)
+            .where(ac_model.PolicyState.id == 1)
+            .values(version=ac_model.PolicyState.version + 1)
+        )
+        if result.rowcount == 0:
+            self.db.execute(insert(ac_model.PolicyState).values(id=1, version=1))
+
+    def get_policy_version(self) -> int | None:
+        """Версия правил или None, если строки с версией нет."""
+        return self.db.execute(
+            select(ac_model.PolicyState.version).where(ac_model.PolicyState.id == 1)
+        ).scalar_one_or_none()
+
     # Role methods
     def create_role(self, role: ac_schema.RoleCreate) -> ac_model.Role:
-        db_role = ac_model.Role(**role.model_dump())
+        stmt = insert(ac_model.Role).values(**role.model_dump()).returning(ac_model.Role)
         try:
-            self.db.add(db_role)
+            db_role = self.db.scalars(stmt).one()
+            self._bump_policy_version()
             self.db.commit()
-            self.db.refresh(db_role)
+            expire_policy_version()
             return db_role
         except SQLAlchemyError as e:
             self.db.rollback()
@@ -28,7 +49,9 @@ class AccessControlRepository:
     def assign_role_to_user(self, user: user_model.User, role: ac_model.Role):
         try:
             user.roles.append(role)
+            self._bump_policy_version()
             self.db.commit()
+            expire_policy_version()
         except SQLAlchemyError as e:
             self.db.rollback()
             raise e
@@ -44,11 +67,12 @@ class AccessControlRepository:
     def create_permission(
         self, permission: ac_schema.PermissionCreate
     ) -> ac_model.Permission:
-        db_permission = ac_model.Permission(**permission.model_dump())
+        stmt = insert(ac_model.Permission).values(**permission.model_dump()).returning(ac_model.Permission)
         try:
-            self.db.add(db_permission)
+            db_permission = self.db.scalars(stmt).one()
+            self._bump_policy_version()
             self.db.commit()
-            self.db.refresh(db_permission)
+            expire_policy_version()
             return db_permission
         except SQLAlchemyError as e:
             self.db.rollback()
@@ -58,11 +82,12 @@ class AccessControlRepository:
     def create_business_element(
         self, element: ac_schema.BusinessElementCreate
     ) -> ac_model.BusinessElement:
-        db_element = ac_model.BusinessElement(**element.model_dump())
+        stmt = insert(ac_model.BusinessElement).values(**element.model_dump()).returning(ac_model.BusinessElement)
         try:
-            self.db.add(db_element)
+            db_element = self.db.scalars(stmt).one()
+            self._bump_policy_version()
             self.db.commit()
-            self.db.refresh(db_element)
+            expire_policy_version()
             return db_element
         except SQLAlchemyError as e:
             self.db.rollback()
@@ -79,7 +104,9 @@ class AccessControlRepository:
                 element_id=element.id,
             )
             self.db.execute(insert_stmt)
+            self._bump_policy_version()
             self.db.commit()
+            expire_policy_version()
         except SQLAlchemyError as e:
             self.db.rollback()
             raise e
@@ -0,0 +1,126 @@
+import secrets
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, insert, or_, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.security import create_refresh_token, hash_refresh_token
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+
+class RefreshTokenRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _insert(self, user_id: int, family_id: str, expires_delta: timedelta) -> str:
+        token = create_refresh_token()
+        self.db.execute(
+            insert(RefreshToken).values(
+                user_id=user_id,
+                token_hash=hash_refresh_token(token),
+                family_id=family_id,
+                expires_at=datetime.utcnow() + expires_delta,
+            )
+        )
+        return token
+
+    def create(self, user_id: int, expires_delta: timedelta) -> str:
+        try:
+            self._purge(user_id, datetime.utcnow())
+            token = self._insert(user_id, secrets.token_hex(16), expires_delta)
+            self.db.commit()
+            return token
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise e
+
+    def rotate(self, token: str, expires_delta: timedelta, reuse_grace: timedelta) -> tuple[User, str] | None:
+        """Отзывает предъявленный токен и выпускает следующий в той же цепочке.
+
+        Возвращает (пользователь, новый токен) или None, если токен недействителен
+        или пользователь удалён/деактивирован (тогда отзывается вся цепочка).
+        Повторное предъявление уже использованного токена отзывает всю цепочку,
+        кроме случая, когда он был использован не раньше reuse_grace назад:
+        это считается гонкой параллельных обновлений (например, двух вкладок).
+        """
+        token_hash = hash_refresh_token(token)
+        now = datetime.utcnow()
+        try:
+            # Условный UPDATE ... RETURNING: из параллельных запросов с одним
+            # токеном успешен только один
+            row = self.db.execute(
+                update(RefreshToken)
+                .where(
+                    RefreshToken.token_hash == token_hash,
+                    RefreshToken.revoked_at.is_(None),
+                    RefreshToken.expires_at > now,
+                )
+                .values(revoked_at=now)
+                .returning(RefreshToken.user_id, RefreshToken.family_id)
+            ).first()
+            if row is None:
+                revoked = self.db.execute(
+                    select(RefreshToken.family_id, RefreshToken.revoked_at).where(
+                        RefreshToken.token_hash == token_hash,
+                        RefreshToken.revoked_at.is_not(None),
+                    )
+                ).first()
+                if revoked is not None and revoked.revoked_at < now - reuse_grace:
+                    self._revoke_family(revoked.family_id, now)
+                self.db.commit()
+                return None
+            user = self.db.execute(select(User).where(User.id == row.user_id)).scalar_one_or_none()
+            if user is None or not user.is_active:
+                self._revoke_family(row.family_id, now)
+                self.db.commit()
+                return None
+            new_token = self._insert(row.user_id, row.family_id, expires_delta)
+            # После вставки нового токена цепочка считается живой и не удаляется
+            self._purge(row.user_id, now)
+            self.db.commit()
+            return user, new_token
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise e
+
+    def revoke(self, token: str, user_id: int) -> bool:
+        """Отзывает цепочку, к которой относится токен пользователя (logout)."""
+        try:
+            family_id = self.db.execute(
+                select(RefreshToken.family_id).where(
+                    RefreshToken.token_hash == hash_refresh_token(token),
+                    RefreshToken.user_id == user_id,
+                )
+            ).scalar_one_or_none()
+            if family_id is None:
+                return False
+            self._revoke_family(family_id, datetime.utcnow())
+            self.db.commit()
+            return True
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise e
+
+    def _revoke_family(self, family_id: str, now: datetime) -> None:
+        self.db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=now)
+        )
+
+    def _purge(self, user_id: int, now: datetime) -> None:
+        # Удаляем истёкшие токены и цепочки пользователя без действующих токенов.
+        # Отозванные токены живых цепочек остаются до истечения срока: по ним
+        # обнаруживается повторное использование.
+        live_families = select(RefreshToken.family_id).where(
+            RefreshToken.user_id == user_id,
+            RefreshToken.revoked_at.is_(None),
+            RefreshToken.expires_at > now,
+        )
+        self.db.execute(
+            delete(RefreshToken).where(
+                RefreshToken.user_id == user_id,
+                or_(RefreshToken.expires_at <= now, RefreshToken.family_id.not_in(live_families)),
+            )
+        )
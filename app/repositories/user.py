@@ -1,27 +1,43 @@
+from sqlalchemy import and_, exists, func, insert, or_, update
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from app.core.security import get_password_hash
+from app.models import access_control as ac_model
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
 
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+# Верхняя граница для диапазонного поиска по префиксу
+_MAX_CHAR = "\U0010ffff"
+
+
 class UserRepository:
     def __init__(self, db: Session):
         self.db = db
 
     def create_user(self, user: UserCreate) -> User:
+        # INSERT ... RETURNING: одна операция вместо INSERT + SELECT при refresh().
+        # Дубликат email приводит к IntegrityError по уникальному индексу.
         hashed_password = get_password_hash(user.password)
-        db_user = User(
-            email=user.email,
-            hashed_password=hashed_password,
-            first_name=user.first_name,
-            last_name=user.last_name,
-            patronymic=user.patronymic,
+        stmt = (
+            insert(User)
+            .values(
+                email=user.email,
+                hashed_password=hashed_password,
+                first_name=user.first_name,
+                last_name=user.last_name,
+                patronymic=user.patronymic,
+            )
+            .returning(User)
         )
         try:
-            self.db.add(db_user)
+            db_user = self.db.scalars(stmt).one()
             self.db.commit()
-            self.db.refresh(db_user)
             return db_user
         except SQLAlchemyError as e:
             self.db.rollback()
@@ -30,23 +46,80 @@ class UserRepository:
     def get_user_by_email(self, email: str) -> User | None:
         return self.db.query(User).filter(User.email == email).first()
 
-    def update_user(self, user: User, user_update: UserUpdate) -> User:
+    def get_user_by_id(self, user_id: int) -> User | None:
+        return self.db.query(User).filter(User.id == user_id).first()
+
+    def list_users(
+        self,
+        limit: int = 50,
+        after_id: int | None = None,
+        is_active: bool | None = None,
+        role: str | None = None,
+        search: str | None = None,
+    ) -> tuple[list[User], int | None]:
+        """Keyset-пагинация по id: возвращает страницу и курсор следующей страницы."""
+        query = self.db.query(User)
+        if after_id is not None:
+            query = query.filter(User.id > after_id)
+        if is_active is not None:
+            query = query.filter(User.is_active == is_active)
+        if role is not None:
+            query = query.filter(
+                exists().where(
+                    and_(
+                        ac_model.user_role_association.c.user_id == User.id,
+                        ac_model.user_role_association.c.role_id == ac_model.Role.id,
+                        ac_model.Role.name == role,
+                    )
+                )
+            )
+        if search:
+            prefix = search.lower()
+            query = query.filter(
+                or_(
+                    self._prefix_match(func.lower(User.email), prefix),
+                    self._prefix_match(func.lower(User.first_name), prefix),
+                    self._prefix_match(func.lower(User.last_name), prefix),
+                )
+            )
+        # Берём на одну запись больше, чтобы узнать, есть ли следующая страница
+        users = query.order_by(User.id).limit(limit + 1).all()
+        next_cursor = None
+        if len(users) > limit:
+            users = users[:limit]
+            next_cursor = users[-1].id
+        return users, next_cursor
+
+    def _prefix_match(self, expr, prefix: str):
+        # Postgres использует индекс lower(...) text_pattern_ops для LIKE 'prefix%'.
+        # SQLite не применяет LIKE-оптимизацию к индексам по выражению,
+        # поэтому там префикс выражается диапазоном, который индекс поддерживает.
+        if self.db.get_bind().dialect.name == "sqlite":
+            return and_(expr >= prefix, expr < prefix + _MAX_CHAR)
+        return expr.like(_escape_like(prefix) + "%", escape="\\")
+
+    def _update_returning(self, user: User, values: dict) -> User:
+        # UPDATE ... RETURNING обновляет объект в identity map без отдельного SELECT
+        stmt = (
+            update(User)
+            .where(User.id == user.id)
+            .values(**values)
+            .returning(User)
+            .execution_options(populate_existing=True, synchronize_session=False)
+        )
         try:
-            for field, value in user_update.model_dump(exclude_unset=True).items():
-                setattr(user, field, value)
+            db_user = self.db.scalars(stmt).one()
             self.db.commit()
-            self.db.refresh(user)
-            return user
+            return db_user
         except SQLAlchemyError as e:
             self.db.rollback()
             raise e
 
-    def delete_user(self, user: User) -> User:
-        try:
-            user.is_active = False
-            self.db.commit()
-            self.db.refresh(user)
+    def update_user(self, user: User, user_update: UserUpdate) -> User:
+        values = user_update.model_dump(exclude_unset=True)
+        if not values:
             return user
-        except SQLAlchemyError as e:
-            self.db.rollback()
-            raise e
+        return self._update_returning(user, values)
+
+    def delete_user(self, user: User) -> User:
+        return self._update_returning(user, {"is_active": False})
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from pydantic import BaseModel, EmailStr, field_validator
+from typing import List, Optional
 
 # Схема для создания пользователя (регистрация)
 class UserCreate(BaseModel):
@@ -16,6 +16,14 @@ class UserUpdate(BaseModel):
     last_name: Optional[str] = None
     patronymic: Optional[str] = None
 
+    # Поле можно не передавать, но явный null недопустим: email обязателен в БД
+    @field_validator("email")
+    @classmethod
+    def email_not_null(cls, value):
+        if value is None:
+            raise ValueError("email cannot be null")
+        return value
+
 # Базовая схема для пользователя (для возврата в API)
 class UserBase(BaseModel):
     id: int
@@ -32,10 +40,19 @@ class UserBase(BaseModel):
 class User(UserBase):
     pass
 
+# Страница списка пользователей (keyset-пагинация по id)
+class UserPage(BaseModel):
+    items: List[User]
+    next_cursor: Optional[int] = None
+
 # Схема для токена
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
 
 class TokenData(BaseModel):
     email: Optional[str] = None
@@ -0,0 +1,65 @@
+"""
+Микробенчмарк сериализации ответов горячих эндпоинтов.
+
+Сравнивает стандартный путь FastAPI (валидация через response_model и
+сериализация через Pydantic) с быстрым путём из app.core.responses.
+Стандартный путь воспроизводится в самом дешёвом варианте (dump_json без
+jsonable_encoder, как в свежих версиях FastAPI), поэтому оценка экономии
+консервативная. База данных не нужна.
+
+Запуск: python -m benchmarks.serialization
+"""
+import os
+import timeit
+
+os.environ.setdefault("PROJECT_NAME", "bench")
+os.environ.setdefault("API_V1_STR", "/api/v1")
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "15")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from typing import List
+
+from pydantic import TypeAdapter
+
+from app.api.business_logic import Article, mock_articles
+from app.core.responses import fast_json_response, user_response
+from app.models.user import User as UserModel
+from app.schemas.user import Token, User
+
+NUMBER = 20000
+
+
+def default_response(schema, data) -> bytes:
+    validated = schema.validate_python(data, from_attributes=True)
+    return schema.dump_json(validated)
+
+
+def run(name: str, func) -> float:
+    seconds = min(timeit.repeat(func, number=NUMBER, repeat=5))
+    per_request_us = seconds / NUMBER * 1e6
+    print(f"{name:<36} {per_request_us:8.2f} us/request")
+    return per_request_us
+
+
+def main() -> None:
+    user = UserModel(id=1, email="admin@example.com", is_active=True, first_name="Иван", last_name="Иванов")
+    token = {"access_token": "x" * 160, "token_type": "bearer", "refresh_token": "y" * 43}
+    user_schema = TypeAdapter(User)
+    token_schema = TypeAdapter(Token)
+    articles_schema = TypeAdapter(List[Article])
+
+    cases = [
+        ("/users/me", lambda: default_response(user_schema, user), lambda: user_response(user).body),
+        ("/login", lambda: default_response(token_schema, token), lambda: fast_json_response(token).body),
+        ("/articles", lambda: default_response(articles_schema, mock_articles), lambda: fast_json_response(mock_articles).body),
+    ]
+    for endpoint, default, fast in cases:
+        before = run(f"{endpoint} default", default)
+        after = run(f"{endpoint} fast", fast)
+        print(f"{endpoint:<36} {before - after:8.2f} us/request saved ({before / after:.1f}x)\n")
+
+
+if __name__ == "__main__":
+    main()
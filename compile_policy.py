@@ -0,0 +1,25 @@
+import argparse
+from app.core.database import SessionLocal, engine, Base
+from app.core.policy_snapshot import compile_snapshot
+from app.config.settings import get_settings
+import app.models.access_control  # noqa: F401
+import app.models.user  # noqa: F401
+
+
+def main():
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Compile access rules into a policy snapshot file")
+    parser.add_argument("path", nargs="?", default=settings.POLICY_SNAPSHOT_PATH)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        version = compile_snapshot(db, args.path)
+        print(f"Policy snapshot version {version} written to '{args.path}'")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
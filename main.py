@@ -1,15 +1,35 @@
 from fastapi import Depends, FastAPI
+from sqlalchemy.schema import CreateIndex
 from app.api import auth, access_control, business_logic
+from app.core.audit import start_audit_logger, stop_audit_logger
+from app.core.policy_snapshot import load_policy_snapshot
 from app.core.database import engine, Base
 from app.config.settings import get_settings
+from app.models import access_control as ac_model
+from app.models.user import User
 
 # Создание таблиц в базе данных
 Base.metadata.create_all(bind=engine)
 
+# create_all не добавляет индексы к уже существующим таблицам,
+# поэтому индексы для списка пользователей создаются отдельно (идемпотентно)
+with engine.begin() as connection:
+    for index in (*User.__table__.indexes, *ac_model.user_role_association.indexes):
+        connection.execute(CreateIndex(index, if_not_exists=True))
+
 settings = get_settings()
 
 app = FastAPI(title=settings.PROJECT_NAME)
 
+@app.on_event("startup")
+def on_startup():
+    start_audit_logger()
+    load_policy_snapshot(settings.POLICY_SNAPSHOT_PATH, settings.POLICY_VERSION_TTL_SECONDS)
+
+@app.on_event("shutdown")
+def on_shutdown():
+    stop_audit_logger()
+
 app.include_router(auth.router, prefix=settings.API_V1_STR + "/auth", tags=["auth"])
 app.include_router(access_control.router, prefix=settings.API_V1_STR + "/ac", tags=["access-control"], dependencies=[Depends(auth.get_current_user)])
 app.include_router(business_logic.router, prefix=settings.API_V1_STR, tags=["business-logic"])